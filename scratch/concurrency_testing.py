@@ -5,11 +5,21 @@
 
 import looker_sdk
 from looker_sdk import models
+import os
+import pickle
 import hashlib
 import argparse
 import csv
 from datetime import datetime as dt
-from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cvalidator')
+# Cached production results older than this are re-run, as content can break without the project changing
+CACHE_TTL_SECONDS = 60 * 60
+# In-flight or completed validator runs keyed by (base_url, workspace, branch)
+_content_validation_cache = {}
+_content_validation_lock = Lock()
 
 def timer(fn):
     """Time a function in seconds"""
@@ -38,6 +48,8 @@ def main(section=None, num_threads=1, print_progress=False):
                         help='name of project to validate. This arg is required.')
     parser.add_argument('--branch', '-b', type=str,
                         help='Name of branch you want to validate. If ommited this will use prod.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse production validator results cached on disk in the last hour at the same project revision.')
     args = parser.parse_args()
     sdk = looker_sdk.init40(section=section)
     sdk2 = looker_sdk.init40(section=section)
@@ -48,12 +60,14 @@ def main(section=None, num_threads=1, print_progress=False):
     with ThreadPoolExecutor(max_workers=num_threads) as pool:
         if print_progress:
             print("Checking for broken content in production and on dev branch.")
-        broken_content_prod = pool.submit(parse_broken_content, base_url, get_broken_content(sdk), folder_data)
-        broken_content_dev = pool.submit(parse_broken_content, base_url, get_broken_content(sdk2), folder_data)
-    while True:
-        if all([f.done() for f in [broken_content_prod, broken_content_dev]]):
-            new_broken_content = compare_broken_content(broken_content_prod.result(), broken_content_dev.result())
-            break
+        content_prod = get_broken_content(sdk, pool, base_url, args.project, use_cache=args.cache)
+        # Uncommitted dev workspace edits don't change the branch ref, so dev results are never cached on disk
+        content_dev = get_broken_content(sdk2, pool, base_url, args.project, 'dev', args.branch)
+        # Validator runs are submitted first, so parsing never waits on work queued behind it
+        broken_content_prod = pool.submit(parse_when_ready, base_url, content_prod, folder_data)
+        broken_content_dev = pool.submit(parse_when_ready, base_url, content_dev, folder_data)
+    wait([broken_content_prod, broken_content_dev])
+    new_broken_content = compare_broken_content(broken_content_prod.result(), broken_content_dev.result())
     if new_broken_content:
         if print_progress:
             print(new_broken_content)
@@ -71,61 +85,103 @@ def get_folder_data(sdk):
     return folder_data
 
 
-def get_broken_content(sdk):
-    """Collect broken content"""
+def get_broken_content(sdk, pool, base_url, project, workspace='production', branch=None, use_cache=False):
+    """Collect broken content
+    Returns a Future shared by every caller asking for the same instance, workspace and branch,
+    so a validator run is only ever in flight once per process"""
+    key = (base_url, workspace, branch)
+    with _content_validation_lock:
+        if key in _content_validation_cache:
+            return _content_validation_cache[key]
+        future = pool.submit(_fetch_broken_content, sdk, project, key, use_cache)
+        _content_validation_cache[key] = future
+    # Added outside the lock, as the callback runs immediately if the run has already finished
+    future.add_done_callback(lambda f: _evict_failed_run(key, f))
+    return future
+
+
+def _evict_failed_run(key, future):
+    """Drop a failed or cancelled validator run from the cache so later callers run it again"""
+    if future.cancelled() or future.exception() is not None:
+        with _content_validation_lock:
+            if _content_validation_cache.get(key) is future:
+                del _content_validation_cache[key]
+
+
+def _fetch_broken_content(sdk, project, key, use_cache=False):
+    """Run the content validator. With use_cache=True, reuse results saved on disk for the same
+    instance and project revision within the last CACHE_TTL_SECONDS
+    NOTE - results also depend on instance content and other projects, which the cache key ignores,
+    so content broken since the results were saved can be reported as new"""
+    if not use_cache:
+        return sdk.content_validation(
+            transport_options={"timeout": 6000}
+        ).content_with_errors
+    rev = sdk.git_branch(project).ref
+    digest = hashlib.md5(repr(key + (project, rev)).encode()).hexdigest()
+    path = os.path.join(CACHE_DIR, f"content-validation-{digest}.pkl")
+    if os.path.exists(path):
+        age = dt.now().timestamp() - os.path.getmtime(path)
+        if age < CACHE_TTL_SECONDS:
+            print(f"WARNING: using {key[1]} validator results cached {age / 60:.0f} mins ago from {path}, "
+                  "content broken since then will be reported as new. Omit --cache to re-run.")
+            with open(path, "rb") as f:
+                return pickle.load(f)
     broken_content = sdk.content_validation(
         transport_options={"timeout": 6000}
     ).content_with_errors
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(broken_content, f)
     return broken_content
 
 
+def parse_when_ready(base_url, broken_content, folder_data):
+    """Wait for a validator run to finish and parse its output"""
+    return parse_broken_content(base_url, broken_content.result(), folder_data)
+
+
 def parse_broken_content(base_url, broken_content, folder_data):
     """Parse and return relevant data from content validator"""
     output = []
+    folder_by_id = {str(f.id): f for f in folder_data}
     for item in broken_content:
         content_type = "dashboard" if item.dashboard else "look"
-        item_content_type = getattr(item, content_type)
-        try:
-            id = item_content_type.id
-            name = item_content_type.title
-            folder_id = item_content_type.folder.id
-            folder_name = item_content_type.folder.name
-            errors = item.errors
-            url = f"{base_url}/{content_type}s/{id}"
-            folder_url = f"{base_url}/folders/{folder_id}"
-        except AttributeError:
-            print(f"{item} has no id...")
-            pass
+        item_content_type = item.dashboard or item.look
+        if not item_content_type or not item_content_type.folder:
+            print(f"{item} has no {content_type} or folder, skipping...")
+            continue
+        id = item_content_type.id
+        name = item_content_type.title
+        folder_id = item_content_type.folder.id
+        folder_name = item_content_type.folder.name
+        errors = item.errors
+        url = f"{base_url}/{content_type}s/{id}"
+        folder_url = f"{base_url}/folders/{folder_id}"
         if content_type == "look":
             element = None
         else:
             dashboard_element = item.dashboard_element
             element = dashboard_element.title if dashboard_element else None
         # Lookup additional folder information
-        folder = next(i for i in folder_data if str(i.id) == str(folder_id))
-        parent_folder_id = folder.parent_id
+        folder = folder_by_id.get(str(folder_id))
+        parent_folder_id = folder.parent_id if folder else None
         # Old version of API  has issue with None type for all_folder() call
         if parent_folder_id is None or parent_folder_id == "None":
             parent_folder_url = None
             parent_folder_name = None
         else:
             parent_folder_url = f"{base_url}/folders/{parent_folder_id}"
-            parent_folder = next(
-                (i for i in folder_data if str(i.id) == str(parent_folder_id)), None
-            )
+            parent_folder = folder_by_id.get(str(parent_folder_id))
             # Handling an edge case where folder has no name. This can happen
             # when users are improperly generated with the API
-            try:
-                parent_folder_name = parent_folder.name
-            except AttributeError:
-                parent_folder_name = None
+            parent_folder_name = parent_folder.name if parent_folder else None
         # Create a unique hash for each record. This is used to compare
         # results across content validator runs
-        unique_id = hashlib.md5(
-            "-".join(
-                [str(id), str(element), str(name), str(errors), str(folder_id)]
-            ).encode()
-        ).hexdigest()
+        payload = b"-".join(
+            (str(id).encode(), str(element).encode(), str(name).encode(), str(errors).encode(), str(folder_id).encode())
+        )
+        unique_id = hashlib.md5(payload, usedforsecurity=False).hexdigest()
         data = {
             "unique_id": unique_id,
             "content_type": content_type,
@@ -144,14 +200,8 @@ def parse_broken_content(base_url, broken_content, folder_data):
 
 def compare_broken_content(broken_content_prod, broken_content_dev):
     """Compare output between 2 content_validation runs"""
-    unique_ids_prod = set([i["unique_id"] for i in broken_content_prod])
-    unique_ids_dev = set([i["unique_id"] for i in broken_content_dev])
-    new_broken_content_ids = unique_ids_dev.difference(unique_ids_prod)
-    new_broken_content = []
-    for item in broken_content_dev:
-        if item["unique_id"] in new_broken_content_ids:
-            new_broken_content.append(item)
-    return new_broken_content
+    unique_ids_prod = {i["unique_id"] for i in broken_content_prod}
+    return [item for item in broken_content_dev if item["unique_id"] not in unique_ids_prod]
 
 
 def checkout_dev_branch(sdk, branch, project):
@@ -165,11 +215,11 @@ def checkout_dev_branch(sdk, branch, project):
 def write_broken_content_to_file(broken_content, output_csv_name):
     """Export new content errors in dev branch to csv file"""
     try:
-        with open(output_csv_name, "w") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=list(broken_content[0].keys()))
-            writer.writeheader()
-            for data in broken_content:
-                writer.writerow(data)
+        fieldnames = list(broken_content[0].keys())
+        with open(output_csv_name, "w", newline="", buffering=1 << 20) as csvfile:
+            writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(fieldnames)
+            writer.writerows(tuple(data[k] for k in fieldnames) for data in broken_content)
         print("Broken content information outputed to {}".format(output_csv_name))
     except IOError:
         print("I/O error")
@@ -177,4 +227,6 @@ def write_broken_content_to_file(broken_content, output_csv_name):
 if __name__ == '__main__':
     for n in [8, 1]:
         print(f"Running with {n} thread(s)")
+        # Start each benchmark run cold, otherwise later runs reuse the first run's results
+        _content_validation_cache.clear()
         main(section='Profservices', num_threads=n, print_progress=True)
\ No newline at end of file
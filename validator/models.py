@@ -1,20 +1,43 @@
 import os
 import uuid
 import json
+import pickle
+import logging
+import hashlib
+from operator import attrgetter
+from threading import Lock
 import looker_sdk
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from looker_sdk.sdk.api40 import models
 from looker_sdk.rtl.transport import TransportOptions
 from looker_sdk.error import SDKError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime as dt
 
 INI_FILE = os.path.join(os.getcwd(), 'looker.ini')
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cvalidator')
+# Bump whenever the pickled FolderTree/LookerFolder layout changes, so older caches are treated as a miss
+TREE_CACHE_VERSION = 2
+SEARCH_PAGE_SIZE = 10000
+POOL_SIZE = 64
+
+logger = logging.getLogger(__name__)
+
+# LookerFolder attributes whose values can be collected up the chain of parent folders
+PARENT_CHAIN_TARGETS = frozenset(('id', 'name', 'content_metadata_id', 'parent_id', 'queries', 'child_queries'))
+
+# (divisor, unit) pairs used to step a number of seconds up to larger units
+_STEPS = ((60, 'mins 🥲'), (60, 'hrs 😬'), (24, 'days 🤯'), (7, 'weeks 💀'))
 
 def print_time_est(t, max_s=10, precision=0):
     """Utility function to format a number of seconds in a nice way"""
     if t is None:
         return f""
+    if t < max_s:
+        return f"{t:,.{precision}f} secs 😊"
     out_s = 'secs 😊'
-    for d, s in [(60, 'mins 🥲'), (60, 'hrs 😬'), (24, 'days 🤯'), (7, 'weeks 💀')]:
+    for d, s in _STEPS:
         if t < (d * max_s):
             break
         else:
@@ -22,6 +45,32 @@ def print_time_est(t, max_s=10, precision=0):
             t /= d
     return f"{t:,.{precision}f} {out_s}"
 
+def configure_transport(sdk, pool_size=POOL_SIZE):
+    """Enlarge the SDK's connection pool so concurrent calls don't queue for a connection,
+    keep connections alive between calls and retry failed connections with backoff
+    Read errors and error statuses are never retried, as re-issuing a timed out content_validation
+    call would restart the server-side run and inflate its measured duration"""
+    session = sdk.transport.session
+    retries = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return sdk
+
+def search_all(method, **kwargs):
+    """Page through an SDK search method until all results are returned
+    Results are sorted by ID unless told otherwise, as unordered pages can skip or repeat rows"""
+    kwargs.setdefault('sorts', 'id')
+    results = []
+    offset = 0
+    while True:
+        page = method(limit=SEARCH_PAGE_SIZE, offset=offset, **kwargs)
+        results.extend(page)
+        if len(page) < SEARCH_PAGE_SIZE:
+            return results
+        offset += SEARCH_PAGE_SIZE
+
 class FolderTree(object):
     """
 Class which takes a looker.ini section string and some optional kwargs
@@ -31,7 +80,9 @@ Args
 --------------------
 section:        str                 The ID of a string in a looker.ini file
 print_progress:   bool (default True) Should scan progress be printed to the console 
-est_interval:   int (default 10)    No. of folders after which to recalculate time remaining
+max_workers:    int (default 32)    No. of threads used to fetch folder content concurrently
+use_cache:      bool (default False) Load the tree from disk if the instance's folders are unchanged since it was saved
+    NOTE - the cache is keyed on folders only, so edits to dashboards or looks are missed while it is used
 
 Helpful Methods
 --------------------
@@ -39,8 +90,9 @@ slice(n)        Return an array of length ~= total queries / n (i.e. 1/nth of qu
     Each array is a dict in format {'content': []content_metadata_id, 'dashboards': []dashboard_id, 'looks': []look_id}
     This is designed to be passed in to a validator run filtered to a subset of content_metadata_ids
 """
-    def __init__(self, section, print_progress=True):
-        self.sdk = looker_sdk.init40(config_file=INI_FILE, section=section)
+    def __init__(self, section, print_progress=True, max_workers=32, use_cache=False):
+        self.sdk = configure_transport(looker_sdk.init40(config_file=INI_FILE, section=section), max(POOL_SIZE, max_workers))
+        self.max_workers = max_workers
         s = dt.now()
         self.id = uuid.uuid4()
         self.tree = {}
@@ -48,8 +100,15 @@ slice(n)        Return an array of length ~= total queries / n (i.e. 1/nth of qu
         self.total_folders = 0
         self.total_dashboards = 0
         self.total_looks = 0
-        self._populate(print_progress)
-        self._fetch_total_queries()
+        res = self.sdk.all_folders(fields='id, parent_id, name, content_metadata_id')
+        cache_path = self._cache_path(section, res) if use_cache else None
+        if use_cache and self._load(cache_path):
+            if print_progress:
+                print(f"Loaded folder tree from {cache_path}")
+        else:
+            self._populate(res, print_progress)
+            if use_cache:
+                self._save(cache_path)
         e = dt.now()
         self.build_time = (e - s).total_seconds()
         if print_progress:
@@ -65,97 +124,179 @@ Consists of {self.total_folders:,} folders, containing:
     {self.total_queries:,} queries total
 """
 
-    def _populate(self, print_progress):
-        """Generate the tree of Looker folders"""
-        s = dt.now()
-        est = None
-        res = self.sdk.all_folders(fields='id, parent_id, name, content_metadata_id')
+    def _populate(self, res, print_progress):
+        """Generate the tree of Looker folders from an all_folders response
+        Content comes from a bulk search where possible, otherwise it is fetched concurrently
+        as each folder requires its own API calls"""
         self.total_folders = len(res)
-        for idx, folder in enumerate(res):
-            if print_progress:
-                prog = idx / self.total_folders
-                if idx > 0:
-                    t = (dt.now() - s).total_seconds()
-                    est = (t / idx) * (self.total_folders - idx)
-                outstr = f"Scanning folder {folder.id:<6} ({idx:^4,d}/{self.total_folders:^4,d}) ~{prog:<5.2%}"
-                if est:
-                    outstr += f" - {print_time_est(est)} remaining"
-                print(outstr)
-            cur = LookerFolder(folder, self.sdk, print_progress)
+        prefetched = self._prefetch_content(print_progress)
+        for folder in res:
+            # Folders missing from a successful bulk search are empty, so there is nothing to fetch
+            fetch = prefetched is not None and folder.id in prefetched
+            cur = LookerFolder(folder, self.sdk, fetch=fetch, prefetched=prefetched)
             self.tree[cur.id] = cur
-            self.total_looks += len(cur.looks)
-            self.total_dashboards += len(cur.dashboards)
+        if prefetched is None:
+            self._fetch_concurrently(print_progress)
+        self.total_looks = sum(map(len, map(attrgetter('looks'), self.tree.values())))
+        self.total_dashboards = sum(map(len, map(attrgetter('dashboard_ids'), self.tree.values())))
         for folder in self.tree.values():
             if folder.parent_id is not None: 
                 self.tree[folder.parent_id].add_child(folder)
+        self._count_queries()
     
-    def _fetch_total_queries(self):
-        """Calculate the total number of queries in the instance
-        Must be run after the tree is generated"""
-        for d in self.tree.values():
-            self.total_queries += d.queries
-
-    def _parse_tree(self, folder, threshold, query_ct=0, buffer={'content': [], 'dashboards': [], 'looks': []}, accumulator=[]):
-        """Recursive function will traverses the tree from parent to children, maintaining a 
-        running count of queries, looks and dashboards"""
-        query_ct += folder.queries
-        if folder.content_metadata_id:
-            buffer['content'].extend(folder.fetch_parent_chain('content_metadata_id'))
-            buffer['dashboards'].extend([d.id for d in folder.dashboards])
-            buffer['looks'].extend(folder.looks)
-        if query_ct >= threshold:
-            data = {"queries": query_ct, "content_metadata": sorted(list(set(buffer['content'])), key=lambda x: int(x)), 'dashboards': buffer['dashboards'], 'looks': buffer['looks']}
-            accumulator.append(data)
-            buffer = {'content': [], 'dashboards': [], 'looks': []}
-            query_ct = 0
-        #TODO: only include in the path if has queries or children (and children have queries)
-        #TODO: this will only work if content metadata is continually appended. If exact matching is used we will need
-        # to reparse the tree to ensure no orphan content in a slice output
-        for child in folder.children:
-            query_ct, buffer, accumulator = self._parse_tree(child, threshold, query_ct, buffer, accumulator)
-        return query_ct, buffer, accumulator
+    def _fetch_concurrently(self, print_progress):
+        """Fetch each folder's content with its own API calls, spread across a thread pool"""
+        s = dt.now()
+        est = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            futures = {ex.submit(f.fetch_content): f for f in self.tree.values()}
+            # Report roughly every 1% of folders, as printing every folder stalls large scans
+            print_every = max(1, self.total_folders // 100)
+            for idx, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                cur = futures[future]
+                if print_progress and (idx % print_every == 0 or idx == self.total_folders):
+                    prog = idx / self.total_folders
+                    t = (dt.now() - s).total_seconds()
+                    est = (t / idx) * (self.total_folders - idx)
+                    outstr = f"Scanned folder {cur.id:<6} ({idx:^4,d}/{self.total_folders:^4,d}) ~{prog:<5.2%}"
+                    if est:
+                        outstr += f" - {print_time_est(est)} remaining"
+                    print(outstr)
 
-    def slice(self, n):
-        """Return an array of dicts each containing ~1/nth of the instance queries"""
-        threshold = (self.total_queries // n) + 1 if n > 1 else self.total_queries
+    def _cache_path(self, section, res):
+        """Path of the cached tree for this section, keyed by a fingerprint of its folders
+        The section is hashed rather than used in the filename, as it may contain path separators"""
+        fingerprint = sorted((str(f.id), str(f.parent_id), str(f.content_metadata_id)) for f in res)
+        section_digest = hashlib.md5(section.encode()).hexdigest()
+        digest = hashlib.md5(repr(fingerprint).encode()).hexdigest()
+        return os.path.join(CACHE_DIR, f"tree-v{TREE_CACHE_VERSION}-{section_digest}-{digest}.pkl")
+
+    def _load(self, cache_path):
+        """Load the tree and its totals from disk, returning False if there is no usable cached copy"""
+        if not os.path.exists(cache_path):
+            return False
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['version'] != TREE_CACHE_VERSION:
+                return False
+            tree = cached['tree']
+            totals = (cached['total_folders'], cached['total_dashboards'], cached['total_looks'], cached['total_queries'])
+        except (pickle.UnpicklingError, AttributeError, EOFError, ImportError, KeyError, TypeError): # written by an incompatible version
+            return False
+        self.tree = tree
+        self.total_folders, self.total_dashboards, self.total_looks, self.total_queries = totals
+        for folder in self.tree.values():
+            folder.sdk = self.sdk
+        return True
+
+    def _save(self, cache_path):
+        """Pickle the tree and its totals so later runs can skip the build"""
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        cached = {
+            'version': TREE_CACHE_VERSION,
+            'tree': self.tree,
+            'total_folders': self.total_folders,
+            'total_dashboards': self.total_dashboards,
+            'total_looks': self.total_looks,
+            'total_queries': self.total_queries,
+        }
+        with open(cache_path, 'wb') as f:
+            pickle.dump(cached, f)
+
+    def _prefetch_content(self, print_progress):
+        """Fetch all dashboards and looks in bulk and bucket them by folder ID
+        Returns None if the search endpoints fail, in which case each folder fetches its own content"""
+        try:
+            dashboards = search_all(self.sdk.search_dashboards, fields='id,folder_id,dashboard_elements(id,query_id)', deleted=False)
+            looks = search_all(self.sdk.search_looks, fields='id,folder_id', deleted=False)
+        except SDKError as e:
+            if print_progress:
+                print(f"Bulk content search failed, falling back to per-folder calls: {e}")
+            return None
+        prefetched = {}
+        for d in dashboards:
+            prefetched.setdefault(d.folder_id, ([], []))[0].append(d)
+        for l in looks:
+            prefetched.setdefault(l.folder_id, ([], []))[1].append(l)
+        return prefetched
+
+    def _count_queries(self):
+        """Set each folder's child_queries in a single post-order traversal, totalling
+        the instance's queries from the root folders. Must be run after the tree is linked"""
+        self.total_queries = 0
+        stack = [(f, False) for f in self.tree.values() if f.parent is None]
+        while stack:
+            folder, visited = stack.pop()
+            if not visited:
+                stack.append((folder, True))
+                stack.extend((c, False) for c in folder.children)
+                continue
+            folder.child_queries = folder.queries + sum(c.child_queries for c in folder.children)
+            if folder.parent is None:
+                self.total_queries += folder.child_queries
+
+    def _parse_tree(self, roots, threshold):
+        """Traverse the tree depth-first from parents to children, maintaining a 
+        running count of queries, looks and dashboards and flushing a slice each time
+        the count reaches the threshold"""
         query_ct = 0
-        buffer = {'content': [], 'dashboards': [], 'looks': []}
+        buffer = {'content': set(), 'dashboards': [], 'looks': []}
         accumulator = []
-        for f in self.tree.values():
-            if f.parent is None:
-                query_ct, buffer, accumulator = self._parse_tree(f, threshold, query_ct, buffer, accumulator) 
+        # Push in reverse so folders are popped in their original order
+        stack = list(reversed(roots))
+        while stack:
+            folder = stack.pop()
+            query_ct += folder.queries
+            if folder.content_metadata_id:
+                buffer['content'].update(folder.fetch_parent_chain('content_metadata_id'))
+                buffer['dashboards'].extend(folder.dashboard_ids)
+                buffer['looks'].extend(folder.looks)
+            if query_ct >= threshold:
+                accumulator.append(self._flush(query_ct, buffer))
+                buffer = {'content': set(), 'dashboards': [], 'looks': []}
+                query_ct = 0
+            #TODO: only include in the path if has queries or children (and children have queries)
+            #TODO: this will only work if content metadata is continually appended. If exact matching is used we will need
+            # to reparse the tree to ensure no orphan content in a slice output
+            stack.extend(reversed(folder.children))
+        if query_ct > 0:
+            accumulator.append(self._flush(query_ct, buffer))
         return accumulator
 
+    def _flush(self, query_ct, buffer):
+        """Format a buffer of content as a slice"""
+        return {"queries": query_ct, "content_metadata": sorted(buffer['content'], key=int), 'dashboards': buffer['dashboards'], 'looks': buffer['looks']}
+
+    def slice(self, n):
+        """Return an array of dicts each containing ~1/nth of the instance queries"""
+        threshold = (self.total_queries // n) + 1 if n > 1 else self.total_queries
+        roots = [f for f in self.tree.values() if f.parent is None]
+        return self._parse_tree(roots, threshold)
 
-class LookerDashboard(object):
-    """
-Convenience class to wrap a LookerDashboard and calculate the number of 
-queries it contains (dashboard elements with a `query` attribute)    
-NOTE: LookML dashboards will raise a ValueError
-"""
-    def __init__(self, sdk_response):
-        self.id = str(int(sdk_response.id)) # Raise a ValueError for IDs that cannot be coerced to ints - skipping LookML dashboards
-        self.id = sdk_response.id
-        self.queries = 0
-        self.dashboard_elements = []
-        self._calculate_queries(sdk_response)
-    
-    def _calculate_queries(self, sdk_response):
-        if sdk_response.dashboard_elements:
-            for el in sdk_response.dashboard_elements:
-                self.dashboard_elements.append(el.id)
-                if el.query:
-                    self.queries += 1
+
+def count_queries(sdk_response):
+    """Return the ID of a dashboard and the number of queries it contains
+    (dashboard elements with a `query_id` attribute)
+    NOTE: LookML dashboards will raise a ValueError"""
+    int(sdk_response.id) # Raise a ValueError for IDs that cannot be coerced to ints - skipping LookML dashboards
+    return sdk_response.id, sum(1 for el in sdk_response.dashboard_elements or () if el.query_id)
 
 
 class LookerFolder(object):
     """
 Class to wrap a Looker Folder. Uses the SDK to fetch the enclosed dashboards and looks
 Can be associated with other Looker Folders as children or parents
+Pass fetch=False to defer the SDK calls, e.g. so they can be submitted to a thread pool
+Pass prefetched ({folder_id: (dashboards, looks)}) to read content from a bulk search instead
+    The bulk search responses are only read during construction and are not kept on the folder
 """
-    def __init__(self, sdk_response, sdk, print_progress=False):
+    __slots__ = ('sdk', 'id', 'name', 'content_metadata_id', 'parent', 'parent_id', 'children', 'looks', 'dashboard_ids',
+                 'queries', 'child_queries', '_parent_chain_cache')
+
+    def __init__(self, sdk_response, sdk, fetch=True, prefetched=None):
         self.sdk = sdk
-        self.print_progress = print_progress
         self.id = sdk_response.id
         self.name = sdk_response.name
         self.content_metadata_id = sdk_response.content_metadata_id
@@ -163,11 +304,12 @@ Can be associated with other Looker Folders as children or parents
         self.parent_id = sdk_response.parent_id
         self.children = []
         self.looks = []
-        self.dashboards = []
+        self.dashboard_ids = []
         self.queries = 0
         self.child_queries = 0
-        self.fetch_content()
-        self.calculate_child_queries()
+        self._parent_chain_cache = {}
+        if fetch:
+            self.fetch_content(None if prefetched is None else prefetched.get(self.id, ([], [])))
     
     def __str__(self):
         out_s = f"Folder: {self.name} ({self.id}) - # children: {len(self.children)}"
@@ -177,41 +319,53 @@ Can be associated with other Looker Folders as children or parents
             out_s += f' - total_queries: {self.queries}'
         return out_s
 
+    def __getstate__(self):
+        """Drop the SDK client when pickling"""
+        state = {k: getattr(self, k) for k in self.__slots__}
+        state['sdk'] = None
+        return state
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
     def fetch_parent_chain(self, target='content_metadata_id'):
-        """Fetch the chain of properties for the parents of this folder"""
-        ALLOWED = self.__dict__.keys()
-        if target not in ALLOWED:
-            raise ValueError(f"Target must be one of {ALLOWED.join(',')}")
-        cur = self
-        buffer = []
-        while True:
-            buffer.append(cur.__dict__[target])
-            if cur.parent is not None:
-                cur = cur.parent
-            else:
-                break
-        return list(set(buffer))
+        """Fetch the chain of properties for the parents of this folder as a tuple
+        Results are cached per target, so only call this once the tree is fully linked"""
+        if target in self._parent_chain_cache:
+            return self._parent_chain_cache[target]
+        if target not in PARENT_CHAIN_TARGETS:
+            raise ValueError(f"Target must be one of {', '.join(sorted(PARENT_CHAIN_TARGETS))}")
+        value = getattr(self, target)
+        chain = (value,)
+        if self.parent is not None:
+            chain += tuple(v for v in self.parent.fetch_parent_chain(target) if v != value)
+        self._parent_chain_cache[target] = chain
+        return chain
 
-    def fetch_content(self):
-        dr = self.sdk.folder_dashboards(self.id, fields='id, dashboard_elements')
-        lr = self.sdk.folder_looks(self.id, fields='id')
+    def fetch_content(self, prefetched=None):
+        """Fetch the enclosed dashboards and looks and count their queries, reading them from
+        a (dashboards, looks) bulk search bucket if passed
+        Only mutates this folder, so is safe to run concurrently across folders"""
+        if prefetched is not None:
+            dr, lr = prefetched
+        else:
+            dr = self.sdk.folder_dashboards(self.id, fields='id, dashboard_elements(id, query_id)')
+            lr = self.sdk.folder_looks(self.id, fields='id')
         for d in dr:
-            if self.print_progress:
-                print(f"\tdashboard {d.id} found")
+            logger.debug("dashboard %s found in folder %s", d.id, self.id)
             self._add_dashboard(d)
         for l in lr:
-            if self.print_progress:
-                print(f"\tlook {l.id} found")
+            logger.debug("look %s found in folder %s", l.id, self.id)
             self._add_look(l.id)
 
     def _add_dashboard(self, sdk_response):
         try:
-            d = LookerDashboard(sdk_response)
-            self.dashboards.append(d)
-            self.queries += d.queries
+            dashboard_id, queries = count_queries(sdk_response)
+            self.dashboard_ids.append(dashboard_id)
+            self.queries += queries
         except ValueError: # skip LookML dashboards
-            if self.print_progress:
-                print(f"Skipped LookML dashboard {sdk_response.id}")
+            logger.debug("Skipped LookML dashboard %s", sdk_response.id)
     
     def _add_look(self, id):
         self.looks.append(id)
@@ -225,20 +379,11 @@ Can be associated with other Looker Folders as children or parents
         """Add a child object to the self.children array"""
         self.children.append(child)
         child._add_parent(self)
-    
-    def calculate_child_queries(self):
-        """Iterate through all children and return the total number of queries
-        represented by the current folder and all descendents."""
-        total = self.queries
-        for c in self.children:
-            total += c.calculate_child_queries()
-        self.child_queries = total
-        return total
 
 
 class ValidatorRunner(object):
     """Pass in create_users or target_user"""
-    def __init__(self, max_timeout=600, create_users=False, target_user=None, sdk=None, section=None, print_progress=True):
+    def __init__(self, max_timeout=600, create_users=False, target_user=None, sdk=None, section=None, print_progress=True, max_workers=16):
         self.create_users = create_users
         self.target_user = str(target_user)
         self.max_timeout = max_timeout
@@ -246,12 +391,21 @@ class ValidatorRunner(object):
         self.print_progress = print_progress
         self.results = {}
         if (not sdk) and section:
-            self.sdk = looker_sdk.init40(config_file=INI_FILE, section=section)
+            self.sdk = configure_transport(looker_sdk.init40(config_file=INI_FILE, section=section), max(POOL_SIZE, max_workers))
         else:
             self.sdk = sdk
         self._fetch_develop_groups_roles()
         self.long_timeout = TransportOptions(timeout=self.max_timeout)
         self.metadata_added = {}
+        self._metadata_lock = Lock()
+        self.max_workers = max_workers
+        self._active_user = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._logout()
         
     def _fetch_develop_groups_roles(self):
         self.sdk.auth.logout()
@@ -273,22 +427,36 @@ class ValidatorRunner(object):
                     break
             self.authed_users.append(target_user)
 
+    def _login(self, target_user):
+        """Impersonate the target user, reusing the session if already logged in as them"""
+        if self._active_user == target_user:
+            return
+        self._logout()
+        self.sdk.auth.login_user(target_user)
+        self._active_user = target_user
+
+    def _logout(self):
+        """Return to the API user's own session"""
+        if self._active_user is not None:
+            self.sdk.auth.logout()
+            self._active_user = None
+
     def _run_validation(self, target_user):
         self._check_fix_access(target_user)
-        self.sdk.auth.login_user(target_user)
+        self._login(target_user)
         s = dt.now()
         self.sdk.content_validation(transport_options=self.long_timeout)
         t = (dt.now() - s).total_seconds()
-        self.sdk.auth.logout()
         return t
 
     def run_validation_from_slices(self, slices, iterations=1):
         total_scanned = 0
         for slice in slices:
             total_scanned += slice['queries']
+            if self.target_user:
+                self._amend_content_metadata(self.target_user, slice['content_metadata'])
             for idx in range(iterations):
                 if self.target_user:
-                    self._amend_content_metadata(self.target_user, slice['content_metadata'])
                     result = self._run_validation(self.target_user)
                     if self.print_progress:
                         print(f"Run ({idx + 1}/{iterations}) for {total_scanned} queries: completed in {print_time_est(result)}")
@@ -301,6 +469,7 @@ class ValidatorRunner(object):
                     ...
                 else:
                     raise ValueError("Must either supply a target user or create_users=True")
+        self._logout()
     
     def print_results(self, total):
         for queries, results in self.results.items():
@@ -312,6 +481,7 @@ class ValidatorRunner(object):
         """Assign the content metadata accesses to the target users.
         passing exact=True will ensure the user ONLY has the exact IDs 
         passed in"""
+        self._logout() # granting access requires the API user's own session
         #TODO! pseudocode as the first SDK method doesn't exist
         # existing = get_current_metadatas(target_user)
         # if exact:
@@ -321,22 +491,28 @@ class ValidatorRunner(object):
         #             ...
         if target_user not in self.metadata_added:
             self.metadata_added[target_user] = []
-        for metadata in metadata_ids:
-            # if metadata not in existing:
-            if metadata not in self.metadata_added[target_user]:
-                body = models.ContentMetaGroupUser(
-                    user_id=target_user,
-                    content_metadata_id=metadata,
-                    permission_type='view'
-                )
-                try:
-                    self.sdk.create_content_metadata_access(body)
-                    self.metadata_added[target_user].append(metadata)
-                except SDKError as e:
-                    message = json.loads(e.args[0])['message']
-                    if 'already has access' in message:
-                        continue
-                    else:
-                        print(f"Content Metadata ID {metadata} failed with message '{message}'")
-                        # raise e # TODO: distinguish valid and invalid Exceptions
-                        continue
+        # if metadata not in existing:
+        pairs = [(target_user, m) for m in metadata_ids if m not in self.metadata_added[target_user]]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            list(ex.map(self._post_one_access, pairs))
+
+    def _post_one_access(self, pair):
+        """Give a user view access to a content metadata ID. Safe to run concurrently"""
+        target_user, metadata = pair
+        body = models.ContentMetaGroupUser(
+            user_id=target_user,
+            content_metadata_id=metadata,
+            permission_type='view'
+        )
+        try:
+            self.sdk.create_content_metadata_access(body)
+            with self._metadata_lock:
+                self.metadata_added[target_user].append(metadata)
+        except SDKError as e:
+            message = json.loads(e.args[0])['message']
+            if 'already has access' in message:
+                return
+            else:
+                print(f"Content Metadata ID {metadata} failed with message '{message}'")
+                # raise e # TODO: distinguish valid and invalid Exceptions
+                return